@@ -1,4 +1,3 @@
-import asyncio
 import atexit
 import logging
 import shutil
@@ -13,7 +12,6 @@ from anyio import run
 from rich.console import Console
 
 from gwdcli.events.mqtt import run_mqtt_client
-from gwdcli.events.queue_loop import AsyncQueueLooper
 from gwdcli.events.settings import EventsSettings
 from gwdcli.events.settings import Paths
 from gwdcli.events.show_dir import show_dir
@@ -194,14 +192,12 @@ async def show_main(
     )
     logger.info("Starting gwd events show")
     logger.info(settings.model_dump_json(indent=2))
-    async_queue = asyncio.Queue()
     async with create_task_group() as tg:
         tui = TUI(settings, read_only=read_only)
         if do_mqtt:
-            tg.start_soon(run_mqtt_client, settings.mqtt, async_queue)
+            tg.start_soon(run_mqtt_client, settings.mqtt, tui.queue)
         if do_sync:
-            tg.start_soon(sync, settings, async_queue)
-        tg.start_soon(AsyncQueueLooper.loop_task, settings, async_queue, tui.queue)
+            tg.start_soon(sync, settings, tui.queue)
         tg.start_soon(tui.tui_task)
 
 
@@ -15,6 +15,39 @@ from result import Err
 from result import Ok
 from result import Result
 
+_EVENT_BASE_FIELDS = set(EventBase.model_fields.keys())
+
+
+def event_time(event: EventBase) -> pd.Timestamp:
+    """The event's creation time, from TimeNS if the event has it."""
+    time_ns = getattr(event, "TimeNS", None)
+    if time_ns is None:
+        time_created_ms = event.TimeCreatedMs
+    else:
+        time_created_ms = time_ns / 1000000
+    return pd.Timestamp(time_created_ms, unit="ms", tz="UTC")
+
+
+def event_summary(event: EventBase) -> Optional[str]:
+    """One line summary of shutdown and problem events, None for other events."""
+    if event.TypeName == "gridworks.event.shutdown":
+        reason = getattr(event, "Reason")
+        newline_idx = reason.find("\n")
+        if newline_idx >= 0:
+            reason = reason[:newline_idx].rstrip(":")
+        return reason
+    if event.TypeName == "gridworks.event.problem":
+        return getattr(event, "Summary").replace("\n", "\\n")
+    return None
+
+
+def event_other_fields(event: EventBase) -> str:
+    """The event's summary if it has one, otherwise its non-base fields as json."""
+    summary = event_summary(event)
+    if summary is None:
+        return json.dumps(event.model_dump(exclude=_EVENT_BASE_FIELDS))
+    return summary
+
 
 class AnyEvent(EventBase, extra="allow"):
     TypeName: str
@@ -40,22 +73,13 @@ class AnyEvent(EventBase, extra="allow"):
         d = self.model_dump(include=set(self.model_fields.keys()))
         if src_from_message and self._message_src:
             d["Src"] = self._message_src
-        if hasattr(self, "TimeNS"):
-            time_created_ms = self.TimeNS / 1000000
-        else:
-            time_created_ms = self.TimeCreatedMs
-        d["TimeCreatedMs"] = pd.Timestamp(time_created_ms, unit="ms", tz="UTC")
+        d["TimeCreatedMs"] = event_time(self)
         if explicit_summary:
             d[other_field_name] = explicit_summary
         else:
-            if interpolate_summary and self.TypeName == "gridworks.event.shutdown":
-                reason = getattr(self, "Reason")
-                newline_idx = reason.find("\n")
-                if newline_idx >= 0:
-                    reason = reason[:newline_idx].rstrip(":")
-                d[other_field_name] = reason
-            elif interpolate_summary and self.TypeName == "gridworks.event.problem":
-                d[other_field_name] = getattr(self, "Summary").replace("\n", "\\n")
+            summary = event_summary(self) if interpolate_summary else None
+            if summary is not None:
+                d[other_field_name] = summary
             else:
                 other_fields = self.other_fields()
                 if collapse_other_fields:
@@ -230,6 +254,37 @@ class AnyEvent(EventBase, extra="allow"):
         return df
 
 
+# Src and TypeName have few distinct values, so they are read as categoricals.
+EVENTS_CSV_DTYPES = {
+    "MessageId": "string",
+    "Src": "category",
+    "TypeName": "category",
+    "other_fields": "string",
+}
+
+
+def read_events_csv(csv_path: Path) -> pd.DataFrame:
+    """
+    Read an events CSV, as written from AnyEvent.to_dataframe(), indexed by UTC TimeCreatedMs.
+
+    Args:
+        csv_path: Path of the CSV file.
+
+    Returns:
+        DataFrame typed per EVENTS_CSV_DTYPES whose index is parsed in one vectorized
+        pd.to_datetime() call, rather than through a per-chunk python date_parser.
+    """
+    df = pd.read_csv(
+        csv_path,
+        index_col="TimeCreatedMs",
+        dtype=EVENTS_CSV_DTYPES,
+        engine="c",
+        na_filter=False,
+    )
+    df.index = pd.to_datetime(df.index, utc=True, format="ISO8601")
+    return df
+
+
 class GWDEvent(BaseModel):
     """This class allows the a message processor to determine that this is an event _internal_ to the gwd client itself,
     not an externally generated event being reported on."""
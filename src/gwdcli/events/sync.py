@@ -1,5 +1,4 @@
 import asyncio
-import functools
 import logging
 import traceback
 from pathlib import Path
@@ -24,6 +23,7 @@ from gwdcli.events.models import AnyEvent
 from gwdcli.events.models import GWDEvent
 from gwdcli.events.models import SyncCompleteEvent
 from gwdcli.events.models import SyncStartEvent
+from gwdcli.events.models import read_events_csv
 from gwdcli.events.settings import EventsSettings
 from gwdcli.events.settings import S3Settings
 
@@ -107,12 +107,7 @@ def generate_directory_csv(
             if not main_csv_path.exists():
                 df.to_csv(main_csv_path)
             else:
-                main_df = pd.read_csv(
-                    main_csv_path,
-                    index_col="TimeCreatedMs",
-                    parse_dates=True,
-                    date_parser=functools.partial(pd.to_datetime, utc=True),
-                )
+                main_df = read_events_csv(main_csv_path)
                 main_ids = set(main_df["MessageId"].index)
                 directory_ids = set(df["MessageId"].index)
                 if not directory_ids.issubset(main_ids):
@@ -1,8 +1,13 @@
+import asyncio
+import bisect
 import functools
-import json
 import logging
+import os
 import queue
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from dataclasses import field
 from datetime import datetime
@@ -11,12 +16,15 @@ from datetime import timezone
 from enum import Enum
 from pathlib import Path
 from typing import Any
+from typing import Callable
 from typing import Optional
 from typing import Sequence
 from typing import Type
 
 import pandas as pd
+from anyio import move_on_after
 from anyio import to_thread
+from anyio.lowlevel import checkpoint
 from gwproto import Message
 from gwproto.messages import EventBase
 from gwproto.messages import ReportEvent
@@ -32,66 +40,95 @@ from rich.table import Column
 from rich.table import Table
 from rich.text import Text
 
-from gwdcli.events.models import AnyEvent
 from gwdcli.events.models import GWDEvent
 from gwdcli.events.models import SyncCompleteEvent
 from gwdcli.events.models import SyncStartEvent
+from gwdcli.events.models import event_other_fields
+from gwdcli.events.models import event_time
+from gwdcli.events.models import read_events_csv
 from gwdcli.events.settings import EventsSettings
 
 
 logger = logging.getLogger("gwd.events")
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncSpinnerData:
     name: str = ""
     spinner_name: str = "pong"
     style: str = "green"
     done_emoji: str = "white_check_mark"
     done: bool = False
-    start_time: datetime = field(default_factory=datetime.now)
-    elapsed: timedelta = timedelta(0)
+    start_monotonic: float = field(default_factory=time.monotonic)
+    elapsed: float = 0.0
 
     def stop(self):
         self.done = True
-        self.elapsed = datetime.now() - self.start_time
+        self.elapsed = time.monotonic() - self.start_monotonic
 
 
 class SyncSpinners:
+    """Sync status panel. The table is built once; each spinner's row is updated
+    in place when the spinner is added or stopped."""
+
     spinners: dict
+    _row_index: dict[str, int]
+    _table: Table
+    _panel: Panel
 
     def __init__(self):
         self.spinners = dict()
+        self._row_index = dict()
+        self._table = Table(style="cyan")
+        self._table.add_column("Status")
+        self._table.add_column("Info")
+        self._panel = Panel(self._table, title="[b]Sync", border_style="blue")
 
     def add(self, spinner_data: SyncSpinnerData):
         self.spinners[spinner_data.name] = spinner_data
+        if spinner_data.name in self._row_index:
+            self._update_row(spinner_data)
+        else:
+            self._row_index[spinner_data.name] = len(self._table.rows)
+            self._table.add_row(*self._renderables(spinner_data))
 
     def get(self, name: str) -> SyncSpinnerData:
         return self.spinners[name]
 
     def stop(self, name: str) -> None:
-        self.get(name).stop()
-
-    def panel(self, **kwargs) -> Panel:
-        table = Table(style="cyan", **kwargs)
-        table.add_column("Status")
-        table.add_column("Info")
-        for spinner_data in self.spinners.values():
-            if spinner_data.done:
-                renderables = (
-                    Emoji(spinner_data.done_emoji),
-                    Text(
-                        f"{spinner_data.name}  {spinner_data.elapsed}",
-                        style=spinner_data.style,
-                    ),
-                )
-            else:
-                renderables = (
-                    Spinner(spinner_data.spinner_name, style=spinner_data.style),
-                    Text(f"{spinner_data.name}  ", style=spinner_data.style),
-                )
-            table.add_row(*renderables)
-        return Panel(table, title="[b]Sync", border_style="blue")
+        spinner_data = self.get(name)
+        spinner_data.stop()
+        self._update_row(spinner_data)
+
+    def has_active(self) -> bool:
+        return any(not spinner_data.done for spinner_data in self.spinners.values())
+
+    def panel(self) -> Panel:
+        return self._panel
+
+    def _update_row(self, spinner_data: SyncSpinnerData) -> None:
+        row_idx = self._row_index[spinner_data.name]
+        for column, renderable in zip(
+            self._table.columns, self._renderables(spinner_data)
+        ):
+            column._cells[row_idx] = renderable
+
+    @staticmethod
+    def _renderables(
+        spinner_data: SyncSpinnerData,
+    ) -> tuple[RenderableType, RenderableType]:
+        if spinner_data.done:
+            return (
+                Emoji(spinner_data.done_emoji),
+                Text(
+                    f"{spinner_data.name}  {spinner_data.elapsed:.2f}s",
+                    style=spinner_data.style,
+                ),
+            )
+        return (
+            Spinner(spinner_data.spinner_name, style=spinner_data.style),
+            Text(f"{spinner_data.name}  ", style=spinner_data.style),
+        )
 
 
 # NOTE - this is manually copied from scada code;
@@ -114,48 +151,130 @@ UNDISPLAYED_EVENTS = {
     "gridworks.event.snapshot.spaceheat",
 }
 
+EVENT_INDEX = "TimeCreatedMs"
+EVENT_COLUMNS = ["MessageId", "Src", "TypeName", "other_fields"]
+
+# (header, style, min_width) of each event table column.
+EVENT_TABLE_COLUMNS = [
+    ("Time", "green", 20),
+    ("TypeName", "cyan", 25),
+    ("Src", "dark_orange", None),
+    ("other_fields", None, None),
+]
+
+# Rows appended to the events CSV between full, sorted rewrites.
+COMPACT_APPENDED_ROWS = 10_000
+
+# Screen refresh interval when nothing has changed; keeps the header clock current.
+IDLE_REFRESH_SECONDS = 1.0
+
+_DEBUG_PREFIX_LEN = len("gridworks.event.debug_cli.")
+
+# (TimeCreatedMs, MessageId, Src, TypeName, other_fields)
+EventRow = tuple[pd.Timestamp, str, str, str, str]
+
+
+def concat_sorted(*dfs: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate dfs, sorting by index only if the result is out of order.
+
+    Events overwhelmingly arrive in time order, so the sort is usually skipped.
+    Empty frames are left out, since pandas warns when concatenating them.
+    """
+    non_empty = [df for df in dfs if not df.empty]
+    if len(non_empty) <= 1:
+        return non_empty[0] if non_empty else dfs[0]
+    df = pd.concat(non_empty)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    return df
+
+
+@functools.lru_cache(maxsize=1)
+def local_second_str(sec: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(sec))
+
+
+@functools.lru_cache(maxsize=None)
+def display_type_name(type_name: str) -> str:
+    return type_name.removeprefix("gridworks.event.").removeprefix("comm.")
+
 
 class TUI:
     settings: EventsSettings
     read_only: bool
-    df: pd.DataFrame
-    live_history_df: pd.DataFrame
-    display_df: pd.DataFrame
+    _df: pd.DataFrame
+    _flushed_dfs: list[pd.DataFrame]
+    live_history: dict[str, list]
+    display_rows: deque[EventRow]
+    _display_ids: set[str]
+    _live_ids: set[str]
+    _known_ids: set[str]
     layout: Layout
     event_table: Table
+    _dirty: dict[str, bool]
     sync_table: Table
     sync_spinners: SyncSpinners
-    queue: queue.Queue
-    gwd_text: Text
+    queue: asyncio.Queue
+    _handlers: dict[type, Callable[[Any], None]]
+    _io_queue: queue.Queue
+    _io_thread: threading.Thread
+    gwd_lines: "LogLines"
     local_tz: timezone
     snaps: dict[str, SnapshotSpaceheat]
     scadas_to_snap: list[str]
+    _snap_time_str: dict[str, str]
+    _snap_slots: list[Panel]
+    _snap_tables: dict[str, tuple[Table, dict[str, int]]]
+    _snap_path_cache: dict[str, Path]
+    _selected_snaps_len: Optional[int]
+    _snap_match_rank: dict[str, Optional[int]]
+    _csv_stat: Optional[tuple[int, int]]
+    _appended_rows: int
+    _reload_pending: bool
 
     def __init__(self, settings: EventsSettings, read_only: bool):
         self.settings = settings
         self.read_only = read_only
         if self.settings.paths.csv_path.exists():
-            self.df = pd.read_csv(
-                self.settings.paths.csv_path,
-                index_col="TimeCreatedMs",
-                parse_dates=True,
-                date_parser=functools.partial(pd.to_datetime, utc=True),
-            )
+            self.df = read_events_csv(self.settings.paths.csv_path)
         else:
             self.df = pd.DataFrame(
-                index=pd.DatetimeIndex([], name="TimeCreatedMs"),
-                columns=["MessageId", "Src", "TypeName", "other_fields"],
+                index=pd.DatetimeIndex([], name=EVENT_INDEX),
+                columns=EVENT_COLUMNS,
             )
             self.df.to_csv(self.settings.paths.csv_path)
+        self._csv_stat = self.csv_stat()
+        self._appended_rows = 0
+        self._reload_pending = False
+        if not self.df.index.is_monotonic_increasing:
+            self.df.sort_index(inplace=True)
         self.df.drop_duplicates("MessageId", inplace=True)
-        self.live_history_df = self.df.head(0)
-        self.display_df = self.extract_display_df()
-        self.queue = queue.Queue()
-        self.gwd_text = Text()
+        self._known_ids = set(self.df["MessageId"].tolist())
+        self.clear_live_history()
+        self.reset_display_rows()
+        self.queue = asyncio.Queue()
+        self._handlers = {
+            GWDEvent: self.handle_gwd_event,
+            Message: self.handle_message,
+        }
+        self._io_queue = queue.Queue()
+        self._io_thread = threading.Thread(
+            target=self._io_worker, name="gwd-io", daemon=True
+        )
+        self._io_thread.start()
+        self.gwd_lines = LogLines()
         self.sync_spinners = SyncSpinners()
         # noinspection PyTypeChecker
         self.local_tz = datetime.now(timezone(timedelta(0))).astimezone().tzinfo
-        self.event_table = self.make_event_table()
+        self._dirty = dict.fromkeys(["events", "snap0", "snap1"], False)
+        self.event_table = self._new_event_table()
+        self.refresh_event_table()
+        self._snap_time_str = dict()
+        self._snap_slots = [Panel("", border_style="blue") for _ in range(2)]
+        self._snap_tables = dict()
+        self._snap_path_cache = dict()
+        self._selected_snaps_len = None
+        self._snap_match_rank = dict()
         self.load_snaps()
         self.select_scadas_for_snaps()
         self.make_layout()
@@ -167,39 +286,69 @@ class TUI:
         member = getattr(self, member_name)
         latest_dir = getattr(self.settings.paths, f"{suffix}_dir")
         path_suffix = f".{suffix}.json"
-        for path in latest_dir.glob(f"**/*{path_suffix}"):
-            with path.open() as f:
-                latest_str = f.read()
+
+        def _decode(path: Path) -> tuple[Path, bytes, Optional[BaseModel], Any]:
+            latest_bytes = path.read_bytes()
             try:
-                decoded = decoder.model_validate_json(latest_str)
+                return (
+                    path,
+                    latest_bytes,
+                    decoder.model_validate_json(latest_bytes),
+                    None,
+                )
             except Exception as e:
-                logger.exception("ERROR handling %s:\n%s\n", path, latest_str)
-                logger.exception(e)
-                # raise e
-            else:
-                member[path.name[: -len(path_suffix)]] = decoded
+                return path, latest_bytes, None, e
+
+        with ThreadPoolExecutor() as executor:
+            for path, latest_bytes, decoded, error in executor.map(
+                _decode, list(latest_dir.glob(f"**/*{path_suffix}"))
+            ):
+                if error is not None:
+                    # Logged outside the decoding except block, so pass the error.
+                    logger.error(
+                        "ERROR handling %s:\n%s\n",
+                        path,
+                        latest_bytes.decode(errors="replace"),
+                        exc_info=error,
+                    )
+                    # raise error
+                else:
+                    member[path.name[: -len(path_suffix)]] = decoded
 
     def select_scadas_for_snaps(self):
-        self.scadas_to_snap = []
-        for requested in self.settings.snaps:
-            for scada in self.snaps:
-                if requested in scada:
-                    self.scadas_to_snap.append(scada)
-        snap_names = list(self.snaps.keys())
-        while len(self.scadas_to_snap) < 2:
-            if len(snap_names):
-                snap_name = snap_names.pop()
-                if snap_name not in self.scadas_to_snap:
+        # self.snaps only ever gains scadas, so its length identifies its contents.
+        if len(self.snaps) == self._selected_snaps_len:
+            return
+        self._selected_snaps_len = len(self.snaps)
+        for scada in self.snaps:
+            if scada not in self._snap_match_rank:
+                # Rank a scada by the first requested --snap value it contains.
+                self._snap_match_rank[scada] = next(
+                    (
+                        rank
+                        for rank, requested in enumerate(self.settings.snaps)
+                        if requested in scada
+                    ),
+                    None,
+                )
+        self.scadas_to_snap = sorted(
+            (scada for scada in self.snaps if self._snap_match_rank[scada] is not None),
+            key=self._snap_match_rank.__getitem__,
+        )
+        if len(self.scadas_to_snap) < 2:
+            selected = set(self.scadas_to_snap)
+            for snap_name in reversed(self.snaps):
+                if len(self.scadas_to_snap) >= 2:
+                    break
+                if snap_name not in selected:
                     self.scadas_to_snap.append(snap_name)
-                else:
-                    self.scadas_to_snap.append("")
-            else:
-                self.scadas_to_snap.append("")
+        while len(self.scadas_to_snap) < 2:
+            self.scadas_to_snap.append("")
 
     def load_snaps(self):
         self._load_latest("snap", "snaps", SnapshotSpaceheat)
 
-    def extract_display_df(self) -> pd.DataFrame:
+    def extract_display_rows(self) -> deque[EventRow]:
         if self.settings.scadas:
             srcs_used = [
                 src
@@ -210,18 +359,87 @@ class TUI:
         else:
             filtered_df = self.df
         filtered_df = filtered_df[~filtered_df["TypeName"].isin(UNDISPLAYED_EVENTS)]
-        return filtered_df.tail(self.settings.tui.displayed_events)
-
-    def reload_dfs(self):
-        self.df = pd.read_csv(
-            self.settings.paths.csv_path,
-            index_col="TimeCreatedMs",
-            parse_dates=True,
-            date_parser=functools.partial(pd.to_datetime, utc=True),
+        filtered_df = filtered_df.tail(self.settings.tui.displayed_events)
+        return deque(
+            zip(
+                filtered_df.index,
+                *(filtered_df[column] for column in EVENT_COLUMNS),
+            ),
+            maxlen=self.settings.tui.displayed_events,
         )
-        self.df = pd.concat([self.df, self.live_history_df]).sort_index()
-        self.df.drop_duplicates("MessageId", inplace=True)
-        self.display_df = self.extract_display_df()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """All known events. Flushed live history is merged in only when asked for."""
+        if self._flushed_dfs:
+            self._df = concat_sorted(self._df, *self._flushed_dfs)
+            self._flushed_dfs = []
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame) -> None:
+        self._df = df
+        self._flushed_dfs = []
+
+    def reset_display_rows(self) -> None:
+        self.display_rows = self.extract_display_rows()
+        self._display_ids = {row[1] for row in self.display_rows}
+
+    def clear_live_history(self) -> None:
+        self.live_history = {name: [] for name in [EVENT_INDEX] + EVENT_COLUMNS}
+        self._live_ids = set()
+
+    def live_history_df(self) -> pd.DataFrame:
+        if not self.live_history[EVENT_INDEX]:
+            return self._df.head(0)
+        columns = dict(self.live_history)
+        index = pd.DatetimeIndex(columns.pop(EVENT_INDEX), name=EVENT_INDEX)
+        return pd.DataFrame(columns, index=index, columns=EVENT_COLUMNS)
+
+    def csv_stat(self) -> tuple[int, int]:
+        stat = os.stat(self.settings.paths.csv_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def read_changed_csv(
+        self,
+    ) -> Optional[tuple[pd.DataFrame, set[str], tuple[int, int]]]:
+        """Read the events CSV, de-duplicated, unless it is unchanged since last read.
+
+        Blocks on pending writes and on the read, so it is run in a worker thread.
+        """
+        # Let pending writes of flushed live history land first.
+        self._io_queue.join()
+        csv_stat = self.csv_stat()
+        if csv_stat == self._csv_stat:
+            # Nothing but this process has written the file since it was last read.
+            return None
+        df = read_events_csv(self.settings.paths.csv_path)
+        if not df.index.is_monotonic_increasing:
+            df.sort_index(inplace=True)
+        df.drop_duplicates("MessageId", inplace=True)
+        return df, set(df["MessageId"].tolist()), csv_stat
+
+    async def reload_dfs(self):
+        self._reload_pending = False
+        if self.live_history[EVENT_INDEX]:
+            # Write out live events first, so the re-read file includes them.
+            self.flush_live_history()
+        result = await to_thread.run_sync(self.read_changed_csv)
+        if result is None:
+            return
+        df, known_ids, self._csv_stat = result
+        # Frames flushed while the file was read may not have reached it.
+        flushed_dfs = [
+            flushed_df[~flushed_df["MessageId"].isin(known_ids)]
+            for flushed_df in self._flushed_dfs
+        ]
+        self.df = concat_sorted(df, *flushed_dfs)
+        self._known_ids = known_ids.union(
+            *(flushed_df["MessageId"] for flushed_df in flushed_dfs)
+        )
+        self.reset_display_rows()
+        self._dirty["events"] = True
+        self.update_dirty_layout()
 
     def make_layout(self):
         self.layout = Layout(name="root")
@@ -251,11 +469,12 @@ class TUI:
         self.layout["header"].update(Header(self.settings.scadas))
         self.layout["events"].update(self.event_table)
         self.layout["GWDEvents"].update(
-            Panel(self.gwd_text, title="[b]GWDEvents", border_style="green")
+            Panel(self.gwd_lines, title="[b]GWDEvents", border_style="green")
         )
-        self.layout["snap0"].update(self.make_snapshot(self.scadas_to_snap[0]))
-        if len(self.settings.scadas) != 1:
-            self.layout["snap1"].update(self.make_snapshot(self.scadas_to_snap[1]))
+        # Snapshot panels stay in place; update_snap_slot() swaps their contents.
+        for idx in range(len(self.layout["latest"].children)):
+            self.layout[f"snap{idx}"].update(self._snap_slots[idx])
+            self.update_snap_slot(idx)
         self.layout["sync"].update(self.sync_spinners.panel())
 
     def handle_gwd_event(self, event: GWDEvent) -> None:
@@ -266,61 +485,81 @@ class TUI:
                 self.sync_spinners.add(SyncSpinnerData(name=name))
             else:
                 self.sync_spinners.stop(name)
-                self.reload_dfs()
-                self.layout["events"].update(self.make_event_table())
-            self.layout["sync"].update(self.sync_spinners.panel())
+                # Done by tui_task(), which can await the re-read off the event loop.
+                self._reload_pending = True
             text = name
         else:
             text = str(event)
             logger.debug(text)
             if len(text) > 100:
                 text = text[:97] + "..."
-        self.gwd_text.append(
-            f"{datetime.now().isoformat()}  "
-            f"{event.TypeName[len('gridworks.event.debug_cli.'):]:24s}  "
-            f"{text}\n"
+        now = time.time()
+        self.gwd_lines.append(
+            f"{local_second_str(int(now))}.{int(now % 1 * 1_000_000):06d}  "
+            f"{event.TypeName[_DEBUG_PREFIX_LEN:].ljust(24)}  "
+            f"{text}"
         )
 
-    def add_row(self, row: pd.Series) -> None:
-        # noinspection PyUnresolvedReferences
-        local_ts = row.name.tz_convert(self.local_tz)
-        row_vals = [
-            local_ts.strftime("%Y-%m-%d %X"),
-            row.TypeName.removeprefix("gridworks.event.").removeprefix("comm."),
-        ]
-        if "Src" in row.index:
-            row_vals.append(row.Src)
-        row_vals.append(row.other_fields)
-        self.event_table.add_row(*row_vals)
-
-    def make_event_table(self) -> Table:
-        self.event_table = Table(*(["Time", "TypeName", "Src", "other_fields"]))
-        self.event_table.columns[0].header_style = "green"
-        self.event_table.columns[0].style = "green"
-        self.event_table.columns[0].min_width = 20
-        self.event_table.columns[1].header_style = "cyan"
-        self.event_table.columns[1].style = "cyan"
-        self.event_table.columns[1].min_width = 25
-        self.event_table.columns[2].header_style = "dark_orange"
-        self.event_table.columns[2].style = "dark_orange"
+    def add_row(self, row: EventRow) -> None:
+        time_created, _, src, type_name, other_fields = row
+        self.event_table.add_row(
+            time_created.tz_convert(self.local_tz).strftime("%Y-%m-%d %X"),
+            display_type_name(type_name),
+            src,
+            other_fields,
+        )
+
+    def add_rows(self, rows: Sequence[EventRow]) -> None:
+        """Add many rows at once, formatting their times in one vectorized call."""
+        if not rows:
+            return
+        time_created, _, srcs, type_names, other_fields = zip(*rows)
+        local_times = (
+            pd.DatetimeIndex(time_created)
+            .tz_convert(self.local_tz)
+            .strftime("%Y-%m-%d %X")
+        )
+        for row_vals in zip(
+            local_times, map(display_type_name, type_names), srcs, other_fields
+        ):
+            self.event_table.add_row(*row_vals)
+
+    def _new_event_table(self) -> Table:
         if self.settings.tui.max_other_fields_width > 0:
-            self.event_table.columns[2].no_wrap = True
-            self.event_table.columns[2].max_width = 40
-            self.event_table.columns[3].no_wrap = True
-            self.event_table.columns[3].max_width = (
-                self.settings.tui.max_other_fields_width
+            max_widths = {
+                "Src": 40,
+                "other_fields": self.settings.tui.max_other_fields_width,
+            }
+        else:
+            max_widths = {}
+        event_table = Table()
+        for header, style, min_width in EVENT_TABLE_COLUMNS:
+            event_table.add_column(
+                header,
+                header_style=style,
+                style=style,
+                min_width=min_width,
+                max_width=max_widths.get(header),
+                no_wrap=header in max_widths,
             )
-        i = 0
-        for _, row in self.display_df.tail(
-            self.settings.tui.displayed_events
-        ).iterrows():
-            i += 1
-            self.add_row(row)
-        return self.event_table
-
-    def update_display(self, message_src: str, message_id: str, row_df: pd.DataFrame):
+        return event_table
+
+    def pop_event_table_row(self) -> None:
+        del self.event_table.rows[0]
+        for column in self.event_table.columns:
+            del column._cells[0]  # noqa
+
+    def refresh_event_table(self) -> None:
+        self._dirty["events"] = False
+        self.event_table.rows.clear()
+        for column in self.event_table.columns:
+            column._cells.clear()  # noqa
+        self.add_rows(self.display_rows)
+
+    def update_display(self, message_src: str, row: EventRow):
         logger.debug("++update_display")
         path_dbg = 0
+        time_created, message_id, _, type_name, _ = row
         # Check if message src is accepted
         if not self.settings.scadas or any(
             scada in message_src for scada in self.settings.scadas
@@ -328,105 +567,260 @@ class TUI:
             path_dbg |= 0x00000001
             # Check if time is in the display window
             if (
-                len(self.display_df) < self.settings.tui.displayed_events
-                or row_df.index[0] >= self.display_df.index[0]
+                len(self.display_rows) < self.settings.tui.displayed_events
+                or time_created >= self.display_rows[0][0]
             ):
                 path_dbg |= 0x00000002
                 # Check if excluded by TypeName
-                if row_df["TypeName"][0] not in UNDISPLAYED_EVENTS:
+                if type_name not in UNDISPLAYED_EVENTS:
                     path_dbg |= 0x00000004
                     # Check if it is already present
-                    if not (self.display_df["MessageId"] == message_id).any():  # noqa
+                    if message_id not in self._display_ids:
                         path_dbg |= 0x00000008
-                        self.display_df = (
-                            pd.concat([self.display_df, row_df])
-                            .sort_index()
-                            .tail(self.settings.tui.displayed_events)
+                        if len(self.display_rows) == self.display_rows.maxlen:
+                            self._display_ids.discard(self.display_rows.popleft()[1])
+                            if not self._dirty["events"]:
+                                self.pop_event_table_row()
+                        self._display_ids.add(message_id)
+                        idx = bisect.bisect_right(
+                            self.display_rows,
+                            time_created,
+                            key=lambda displayed: displayed[0],
                         )
-                        self.layout["events"].update(self.make_event_table())
-        logger.debug(f"--update_display: 0x{path_dbg:08X}")
+                        self.display_rows.insert(idx, row)
+                        if (
+                            idx == len(self.display_rows) - 1
+                            and not self._dirty["events"]
+                        ):
+                            path_dbg |= 0x00000010
+                            self.add_row(row)
+                        else:
+                            # Rebuilt once per tick, by update_dirty_layout().
+                            path_dbg |= 0x00000020
+                            self._dirty["events"] = True
+        logger.debug("--update_display: 0x%08X", path_dbg)
+
+    def flush_live_history(self, compact: bool = False):
+        live_df = self.live_history_df()
+        if not live_df.index.is_monotonic_increasing:
+            live_df = live_df.sort_index()
+        self._flushed_dfs.append(live_df)
+        self._known_ids |= self._live_ids
+        self._appended_rows += len(live_df)
+        if compact or self._appended_rows > COMPACT_APPENDED_ROWS:
+            # Rewrite the whole file sorted, since appends may be out of order.
+            self._io_queue.put(functools.partial(self.compact_csv, self.df))
+            self._appended_rows = 0
+        else:
+            self._io_queue.put(functools.partial(self.append_csv, live_df))
+        self.clear_live_history()
+
+    def shutdown(self) -> None:
+        """Write out live history, compacting the CSV, then stop the writer thread
+        once it has finished all pending file writes."""
+        if not self._io_thread.is_alive():
+            return
+        if not self.read_only and (
+            self.live_history[EVENT_INDEX] or self._appended_rows
+        ):
+            self.flush_live_history(compact=True)
+        # None tells _io_worker to exit after the jobs queued ahead of it.
+        self._io_queue.put(None)
+        self._io_thread.join()
+
+    def csv_unchanged(self) -> bool:
+        """Whether the CSV is still as this process last read or wrote it."""
+        try:
+            return self.csv_stat() == self._csv_stat
+        except FileNotFoundError:
+            return False
+
+    def record_csv_write(self, csv_was_unchanged: bool) -> None:
+        # If something else (sync) changed the file before this write, leave it
+        # marked as changed, so that reload_dfs() re-reads it.
+        self._csv_stat = self.csv_stat() if csv_was_unchanged else None
+
+    def compact_csv(self, df: pd.DataFrame) -> None:
+        """Rewrite the CSV sorted and de-duplicated, as the union of df and the file.
+
+        The file is merged in, rather than overwritten by df, so that rows written
+        by others (sync) since it was last read are kept.
+        """
+        csv_was_unchanged = self.csv_unchanged()
+        if self.settings.paths.csv_path.exists():
+            df = concat_sorted(read_events_csv(self.settings.paths.csv_path), df)
+            df = df[~df["MessageId"].duplicated()]
+        df.to_csv(self.settings.paths.csv_path)
+        self.record_csv_write(csv_was_unchanged)
+
+    def append_csv(self, df: pd.DataFrame) -> None:
+        csv_was_unchanged = self.csv_unchanged()
+        with self.settings.paths.csv_path.open("a", newline="") as f:
+            df.to_csv(f, header=f.tell() == 0)
+        self.record_csv_write(csv_was_unchanged)
 
-    def flush_live_history(self):
-        concatdf = pd.concat([self.df, self.live_history_df]).sort_index()
-        droppeddf = concatdf.drop_duplicates("MessageId")
-        droppeddf.to_csv(self.settings.paths.csv_path)
-        self.df = droppeddf
-        self.live_history_df = self.df.head(0)
+    @staticmethod
+    def write_snapshot(snapshot_path: Path, snap_str: str) -> None:
+        # Write then rename so _load_latest never sees a partial file.
+        tmp_path = snapshot_path.with_suffix(snapshot_path.suffix + ".tmp")
+        tmp_path.write_text(snap_str)
+        os.replace(tmp_path, snapshot_path)
 
-    def update_live_history(self, message_id: str, row_df: pd.DataFrame):
+    def _io_worker(self) -> None:
+        while True:
+            job = self._io_queue.get()
+            try:
+                if job is None:
+                    return
+                job()
+            except Exception as e:
+                logger.exception("ERROR in file write: %s", e)
+            finally:
+                self._io_queue.task_done()
+
+    def update_live_history(self, rows: Sequence[EventRow]):
         logger.debug("++update_live_history")
         path_dbg = 0
-        if (
-            not self.read_only
-            and not (self.live_history_df["MessageId"] == message_id).any()  # noqa
-            and not (self.df["MessageId"] == message_id).any()  # noqa
-        ):
+        if not self.read_only:
             path_dbg |= 0x00000001
-            self.live_history_df = pd.concat(
-                [self.live_history_df, row_df]
-            ).sort_index()
-            if len(self.live_history_df) > 100:
-                path_dbg |= 0x00000002
+            for row in rows:
+                message_id = row[1]
+                if (
+                    message_id not in self._live_ids
+                    and message_id not in self._known_ids
+                ):
+                    path_dbg |= 0x00000002
+                    self._live_ids.add(message_id)
+                    for column, value in zip(self.live_history.values(), row):
+                        column.append(value)
+            if len(self._live_ids) > 100:
+                path_dbg |= 0x00000004
                 self.flush_live_history()
-        logger.debug(f"--update_live_history: 0x{path_dbg:08X}")
+        logger.debug("--update_live_history: 0x%08X", path_dbg)
 
-    def handle_event(self, message_src: str, event: EventBase) -> None:
-        logger.debug("++handle_event")
-        if event.TypeName in ["gridworks.event.problem", "gridworks.event.shutdown"]:
-            logger.info(event.model_dump_json(indent=2))
-        row_df = AnyEvent(**event.model_dump()).as_dataframe(
-            columns=self.df.columns.values, interpolate_summary=True
+    @staticmethod
+    def _event_to_row(event: EventBase) -> EventRow:
+        """Equivalent to AnyEvent.as_pandas_record(interpolate_summary=True), read
+        directly from the already validated event instead of re-validating it as
+        an AnyEvent."""
+        return (
+            event_time(event),
+            event.MessageId,
+            event.Src,
+            event.TypeName,
+            event_other_fields(event),
         )
-        self.update_display(message_src, event.MessageId, row_df)
-        self.update_live_history(event.MessageId, row_df)
-        logger.debug("--handle_event")
+
+    def handle_event(self, message_src: str, event: EventBase) -> None:
+        self.handle_events_batch([(message_src, event)])
+
+    def handle_events_batch(self, events: Sequence[tuple[str, EventBase]]) -> None:
+        logger.debug("++handle_events_batch")
+        rows = []
+        for message_src, event in events:
+            if event.TypeName in [
+                "gridworks.event.problem",
+                "gridworks.event.shutdown",
+            ] and logger.isEnabledFor(logging.INFO):
+                logger.info(event.model_dump_json(indent=2))
+            row = self._event_to_row(event)
+            self.update_display(message_src, row)
+            rows.append(row)
+        self.update_live_history(rows)
+        logger.debug("--handle_events_batch: %d", len(events))
 
     def handle_snapshot(self, snap: SnapshotSpaceheat):
         logger.debug("++handle_snapshot")
         path_dbg = 0
         try:
-            snapshot_path = self.settings.paths.snap_path(snap.FromGNodeAlias)
-            if not snapshot_path.exists():
+            # self.snaps holds the latest stored snapshot for each alias, since it is
+            # loaded from the snapshot files at startup and updated below.
+            if snap.FromGNodeAlias not in self.snaps:
                 path_dbg |= 0x00000001
                 newer = True
             else:
                 path_dbg |= 0x00000002
-                with snapshot_path.open() as f:
-                    snap_dict = json.loads(f.read())
-                    stored_time = snap_dict.get("Snapshot", dict()).get(
-                        "ReportTimeUnixMs", 0
-                    )
-                    newer = snap.SnapshotTimeUnixMs > stored_time
+                stored_time = self.snaps[snap.FromGNodeAlias].SnapshotTimeUnixMs
+                newer = snap.SnapshotTimeUnixMs > stored_time
             if newer:
                 path_dbg |= 0x00000004
-                snap_str = json.dumps(snap.model_dump(), sort_keys=True, indent=2)
-                with snapshot_path.open("w") as f:
-                    f.write(snap_str)
+                snap_str = snap.model_dump_json(indent=2)
+                self._io_queue.put(
+                    functools.partial(
+                        self.write_snapshot,
+                        self.snap_path(snap.FromGNodeAlias),
+                        snap_str,
+                    )
+                )
                 self.snaps[snap.FromGNodeAlias] = snap
+                self._snap_time_str[snap.FromGNodeAlias] = self.format_snapshot_time(
+                    snap
+                )
+                if not self.update_snapshot_table(snap):
+                    self._snap_tables.pop(snap.FromGNodeAlias, None)
                 self.select_scadas_for_snaps()
                 for idx in range(len(self.layout["latest"].children)):
                     path_dbg |= 0x00000008
                     if snap.FromGNodeAlias == self.scadas_to_snap[idx]:
                         path_dbg |= 0x00000010
-                        self.layout[f"snap{idx}"].update(
-                            self.make_snapshot(snap.FromGNodeAlias)
-                        )
-                logger.debug(f"Snapshot from {snap.FromGNodeAlias}:")
+                        self._dirty[f"snap{idx}"] = True
+                logger.debug("Snapshot from %s:", snap.FromGNodeAlias)
                 logger.debug(snap_str)
         except Exception as e:
             path_dbg |= 0x00000020
-            logger.exception(f"ERROR handling snapshot: {e}")
-        logger.debug(f"--handle_snapshot  path:0x{path_dbg:08X}")
+            logger.exception("ERROR handling snapshot: %s", e)
+        logger.debug("--handle_snapshot  path:0x%08X", path_dbg)
 
-    def make_snapshot(self, name: str) -> RenderableType:
-        if name not in self.snaps:
-            return Panel("", border_style="blue")
-        snap = self.snaps[name]
-        report_time = (
+    def snap_path(self, alias: str) -> Path:
+        if alias not in self._snap_path_cache:
+            self._snap_path_cache[alias] = self.settings.paths.snap_path(alias)
+        return self._snap_path_cache[alias]
+
+    def format_snapshot_time(self, snap: SnapshotSpaceheat) -> str:
+        return (
             pd.Timestamp(snap.SnapshotTimeUnixMs, unit="ms", tz="UTC")
             .tz_convert(self.local_tz)
             .strftime("%Y-%m-%d %X")
         )
+
+    def update_snapshot_table(self, snap: SnapshotSpaceheat) -> bool:
+        """Overwrite the value cells of the cached table for snap.FromGNodeAlias in place.
+
+        Returns False, leaving the table untouched, if there is no cached table or if its
+        channels differ from those in snap.
+        """
+        if snap.FromGNodeAlias not in self._snap_tables:
+            return False
+        table, channel_rows = self._snap_tables[snap.FromGNodeAlias]
+        if len(channel_rows) != len(snap.LatestReadingList) or any(
+            reading.ChannelName not in channel_rows
+            for reading in snap.LatestReadingList
+        ):
+            return False
+        value_cells = table.columns[1]._cells  # noqa
+        for reading in snap.LatestReadingList:
+            value_cells[channel_rows[reading.ChannelName]] = f"{reading.Value}"
+        table.title = f"\nSnapshot at [green]{self._snap_time_str[snap.FromGNodeAlias]}"
+        return True
+
+    def update_snap_slot(self, idx: int) -> None:
+        name = self.scadas_to_snap[idx]
+        slot = self._snap_slots[idx]
+        if name in self.snaps:
+            slot.renderable = self.make_snapshot(name)
+            slot.title = f"[b]{name}"
+        else:
+            slot.renderable = ""
+            slot.title = None
+
+    def make_snapshot(self, name: str) -> Table:
+        if name in self._snap_tables:
+            return self._snap_tables[name][0]
+        snap = self.snaps[name]
+        if name not in self._snap_time_str:
+            self._snap_time_str[name] = self.format_snapshot_time(snap)
+        report_time = self._snap_time_str[name]
+        channel_rows = dict()
         table = Table(
             Column("Node", header_style="dark_orange", style="dark_orange"),
             Column(
@@ -438,7 +832,7 @@ class TUI:
             Column("Unit", header_style="orchid1", style="orchid1"),
             title=f"\nSnapshot at [green]{report_time}",
         )
-        for i in range(len(snap.LatestReadingList)):
+        for i, reading in enumerate(snap.LatestReadingList):
             # requires access to channel list
             # telemetry_name = snap.Snapshot.TelemetryNameList[i]
             # if (
@@ -485,12 +879,10 @@ class TUI:
             #     value_str = f"{snap.Snapshot.ValueList[i]}"
             #     unit = snap.Snapshot.TelemetryNameList[i].value
             # table.add_row(snap.Snapshot.AboutNodeAliasList[i], value_str, unit)
-            table.add_row(
-                snap.LatestReadingList[i].ChannelName,
-                f"{snap.LatestReadingList[i].Value}",
-                "?",
-            )
-        return Panel(table, title=f"[b]{snap.FromGNodeAlias}", border_style="blue")
+            channel_rows[reading.ChannelName] = i
+            table.add_row(reading.ChannelName, f"{reading.Value}", "?")
+        self._snap_tables[name] = (table, channel_rows)
+        return table
 
     def handle_message(self, message: Message):
         logger.debug("++handle_message")
@@ -504,51 +896,123 @@ class TUI:
                 self.handle_event(message.src(), message.Payload)
             case _:
                 path_dbg |= 0x00000040
-        logger.debug(f"--handle_message: 0x{path_dbg:08X}")
+        logger.debug("--handle_message: 0x%08X", path_dbg)
 
     def handle_other(self, item: Any) -> None:
         pass
 
-    def check_sync_queue(self):
+    def drain_queue(self, first_item: Any = None, max_batch: int = 256):
+        """Handle first_item and up to max_batch items already waiting in the queue.
+
+        The bound keeps a burst from holding the event loop; whatever remains is
+        handled on the next pass of tui_task().
+        """
+        batch = [] if first_item is None else [first_item]
         try:
-            while True:
-                path_dbg = 0
-                match item := self.queue.get(block=False):
-                    case GWDEvent():
-                        path_dbg |= 0x00000001
-                        self.handle_gwd_event(item)
-                    case Message():
-                        path_dbg |= 0x00000010
-                        self.handle_message(item)
-                    case _:
-                        path_dbg |= 0x00000020
-                        self.handle_other(item)
-                logger.debug(f"--check_sync_queue: 0x{path_dbg:08X}")
-        except queue.Empty:
+            while len(batch) < max_batch:
+                batch.append(self.queue.get_nowait())
+        except asyncio.QueueEmpty:
             pass
+        # Events keyed by MessageId, so duplicates within a run are handled once.
+        pending_events: dict[str, tuple[str, EventBase]] = dict()
+        for item in batch:
+            if isinstance(item, Message) and isinstance(item.Payload, EventBase):
+                pending_events[item.Payload.MessageId] = (item.src(), item.Payload)
+                continue
+            if pending_events:
+                self.handle_events_batch(list(pending_events.values()))
+                pending_events = dict()
+            self._dispatch(item)
+        if pending_events:
+            self.handle_events_batch(list(pending_events.values()))
+        self.update_dirty_layout()
 
-    def loop(self):
-        with Live(
-            self.layout,
-            refresh_per_second=self.settings.tui.updates_per_second,
-            screen=False,
-        ):
-            last_flush = time.time()
-            while True:
-                time.sleep(1)
-                self.check_sync_queue()
-                if not self.read_only and len(self.live_history_df) > 0:
+    def _dispatch(self, item: Any) -> None:
+        handler = self._handlers.get(type(item))
+        if handler is None:
+            handler = self._resolve_handler(type(item))
+        handler(item)
+
+    def _resolve_handler(self, item_type: type) -> Callable[[Any], None]:
+        """Find the handler registered for the nearest base class of item_type and
+        remember it for item_type, so the MRO is walked once per concrete type."""
+        handler = next(
+            (
+                self._handlers[base]
+                for base in item_type.__mro__
+                if base in self._handlers
+            ),
+            self.handle_other,
+        )
+        self._handlers[item_type] = handler
+        return handler
+
+    def update_dirty_layout(self):
+        if self._dirty["events"]:
+            self.refresh_event_table()
+        for idx in range(len(self.layout["latest"].children)):
+            if self._dirty[f"snap{idx}"]:
+                self.update_snap_slot(idx)
+        self._dirty = dict.fromkeys(self._dirty, False)
+
+    async def tui_task(self):
+        # The screen is refreshed after changes or while sync spinners are running,
+        # at most updates_per_second times a second, and otherwise only for the clock.
+        update_seconds = 1 / self.settings.tui.updates_per_second
+        try:
+            with Live(self.layout, auto_refresh=False, screen=False) as live:
+                last_flush = time.time()
+                last_refresh = 0.0
+                changed = True
+                while True:
+                    next_flush = last_flush + self.settings.tui.flush_seconds
+                    if changed or self.sync_spinners.has_active():
+                        next_refresh = last_refresh + update_seconds
+                    else:
+                        next_refresh = last_refresh + IDLE_REFRESH_SECONDS
+                    with move_on_after(min(next_flush, next_refresh) - time.time()):
+                        self.drain_queue(await self.queue.get())
+                        changed = True
+                    if self._reload_pending:
+                        await self.reload_dfs()
+                    # Queue.get() does not yield while items are waiting, so let the
+                    # producers run between batches.
+                    await checkpoint()
                     now = time.time()
-                    if now > last_flush + self.settings.tui.flush_seconds:
-                        self.flush_live_history()
+                    if now >= next_flush:
+                        if not self.read_only and self.live_history[EVENT_INDEX]:
+                            self.flush_live_history()
                         last_flush = now
+                    if now >= next_refresh:
+                        live.refresh()
+                        last_refresh = now
+                        changed = False
+        finally:
+            self.shutdown()
 
-    async def tui_task(self):
-        await to_thread.run_sync(self.loop)
+
+class LogLines:
+    """Display the most recent lines of a log, joined only when rendered."""
+
+    lines: deque[str]
+
+    def __init__(self, max_lines: int = 200):
+        self.lines = deque(maxlen=max_lines)
+
+    def append(self, line: str) -> None:
+        self.lines.append(line)
+
+    def __rich__(self) -> Text:
+        return Text("\n".join(self.lines))
 
 
 class Header:
     scadas: Sequence[str]
+    title: str
+    _last_sec: int
+    _cached_clock: str
+    _grid: Table
+    _panel: Panel
 
     """Display header with clock."""
 
@@ -557,21 +1021,26 @@ class Header:
             self.scadas = scadas[:]
         else:
             self.scadas = []
+        self.title = "[b]Gridworks Events"
+        if self.scadas:
+            self.title += " from Scadas: " + ", ".join(self.scadas)
+        self._last_sec = -1
+        self._cached_clock = ""
+        self._grid = Table.grid(expand=True)
+        self._grid.add_column(justify="center", ratio=1)
+        self._grid.add_column(justify="right")
+        self._grid.add_row(self.title, self.clock())
+        self._panel = Panel(self._grid, style="white on blue")
+
+    def clock(self) -> str:
+        now_sec = int(time.time())
+        if now_sec != self._last_sec:
+            self._cached_clock = (
+                datetime.fromtimestamp(now_sec).ctime().replace(":", "[blink]:[/]")
+            )
+            self._last_sec = now_sec
+        return self._cached_clock
 
-    # noinspection PyMethodMayBeStatic
     def __rich__(self) -> Panel:
-        grid = Table.grid(expand=True)
-        grid.add_column(justify="center", ratio=1)
-        grid.add_column(justify="right")
-        title = "[b]Gridworks Events"
-        if self.scadas:
-            title += " from Scadas: "
-            for i, scada in enumerate(self.scadas):
-                title += scada
-                if i < len(self.scadas) - 1:
-                    title += ", "
-        grid.add_row(
-            title,
-            datetime.now().ctime().replace(":", "[blink]:[/]"),
-        )
-        return Panel(grid, style="white on blue")
+        self._grid.columns[1]._cells[0] = self.clock()
+        return self._panel
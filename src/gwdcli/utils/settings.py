@@ -1,6 +1,9 @@
 from pathlib import Path
+from typing import Any
 
 from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic import PrivateAttr
 
 
 RELATIVE_DEBUG_CLI_PATH = Path("gridworks/debug-cli")
@@ -11,13 +14,22 @@ def config_file_name(app: str) -> str:
 
 
 class S3Settings(BaseModel):
+    # Frozen so the cached prefixes below cannot go stale.
+    model_config = ConfigDict(frozen=True)
+
     bucket: str = ""
     prefix: str = ""
     profile: str = ""
     region: str = ""
+    _clean_prefix: str = PrivateAttr("")
+    _bucket_plus_prefix: str = PrivateAttr("")
+
+    def model_post_init(self, __context: Any) -> None:
+        self._clean_prefix = self.prefix.rstrip("/")
+        self._bucket_plus_prefix = f"{self.bucket}/{self._clean_prefix}"
 
     def subprefix(self, subdir: str) -> str:
-        return f"{self.prefix.rstrip('/')}/{subdir}"
+        return f"{self._clean_prefix}/{subdir}"
 
     def synced_key(self, subdir: str) -> str:
-        return f"{self.bucket}/{self.subprefix(subdir)}"
+        return f"{self._bucket_plus_prefix}/{subdir}"
@@ -0,0 +1,38 @@
+"""Test cases for the gwdcli.events.models module."""
+
+from pathlib import Path
+
+import pandas as pd
+
+from gwdcli.events.models import read_events_csv
+
+
+def test_read_events_csv_mixed_timestamp_formats(tmp_path: Path) -> None:
+    """It parses an index that to_csv wrote with and without fractional seconds."""
+    index = pd.DatetimeIndex(
+        [
+            pd.Timestamp(1_700_000_000_000, unit="ms", tz="UTC"),
+            pd.Timestamp(1_700_000_000_123, unit="ms", tz="UTC"),
+            pd.Timestamp(1_700_000_001_000, unit="ms", tz="UTC"),
+        ],
+        name="TimeCreatedMs",
+    )
+    df = pd.DataFrame(
+        {
+            "MessageId": ["a", "b", "c"],
+            "Src": ["beta.scada"] * 3,
+            "TypeName": ["gridworks.event.problem"] * 3,
+            "other_fields": ["x", "", "z"],
+        },
+        index=index,
+    )
+    csv_path = tmp_path / "events.csv"
+    # Whole seconds are written as e.g. "2023-11-14 22:13:20+00:00".
+    for written_df in [df.iloc[:1], df.iloc[1:]]:
+        with csv_path.open("a") as f:
+            written_df.to_csv(f, header=f.tell() == 0)
+
+    read_df = read_events_csv(csv_path)
+    assert read_df.index.equals(index)
+    assert read_df["MessageId"].tolist() == ["a", "b", "c"]
+    assert read_df["other_fields"].tolist() == ["x", "", "z"]
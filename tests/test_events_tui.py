@@ -0,0 +1,207 @@
+"""Test cases for the gwdcli.events.tui module."""
+
+import uuid
+from pathlib import Path
+
+import anyio
+import pandas as pd
+import pytest
+from gwproto import Message
+from gwproto.messages import EventBase
+from gwproto.messages import ProblemEvent
+from gwproto.messages import Problems
+from gwproto.messages import ShutdownEvent
+from gwproto.messages import StartupEvent
+from gwproto.named_types import SingleReading
+from gwproto.named_types import SnapshotSpaceheat
+
+from gwdcli.events import tui
+from gwdcli.events.models import AnyEvent
+from gwdcli.events.models import MQTTFullySubscribedEvent
+from gwdcli.events.models import read_events_csv
+from gwdcli.events.settings import EventsSettings
+from gwdcli.events.settings import Paths
+
+
+def make_settings(tmp_path: Path) -> EventsSettings:
+    settings = EventsSettings(
+        paths=Paths(
+            config_path=tmp_path / "gwd.events.config.json",
+            csv_path=tmp_path / "events.csv",
+        )
+    )
+    settings.paths.mkdirs()
+    return settings
+
+
+def make_tui(tmp_path: Path, read_only: bool = False) -> tui.TUI:
+    return tui.TUI(make_settings(tmp_path), read_only=read_only)
+
+
+def make_row(i: int, src: str = "beta.scada") -> tui.EventRow:
+    return (
+        pd.Timestamp(1_700_000_000_000 + i * 1000, unit="ms", tz="UTC"),
+        f"message-{src}-{i}",
+        src,
+        "gridworks.event.problem",
+        f"summary {i}",
+    )
+
+
+def flush_rows(t: tui.TUI, rows: list[tui.EventRow]) -> None:
+    t.update_live_history(rows)
+    t.flush_live_history()
+    t._io_queue.join()
+
+
+def add_external_row(csv_path: Path, i: int) -> tui.EventRow:
+    """Rewrite csv_path with one more row, as sync's generate_directory_csv does."""
+    external_row = make_row(i, src="ext.scada")
+    external_df = pd.DataFrame(
+        [external_row[1:]],
+        columns=tui.EVENT_COLUMNS,
+        index=pd.DatetimeIndex([external_row[0]], name=tui.EVENT_INDEX),
+    )
+    pd.concat([read_events_csv(csv_path), external_df]).sort_index().to_csv(csv_path)
+    return external_row
+
+
+def test_external_rewrite_survives_append_reload_and_compaction(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Rows written to the CSV by sync reach df, and are kept by compaction."""
+    monkeypatch.setattr(tui, "COMPACT_APPENDED_ROWS", 7)
+    t = make_tui(tmp_path)
+    csv_path = t.settings.paths.csv_path
+    flush_rows(t, [make_row(i) for i in range(3)])
+
+    # sync rewrites the file with a row this process has not seen.
+    external_row = add_external_row(csv_path, -1)
+
+    # A live flush appends before SyncComplete arrives.
+    flush_rows(t, [make_row(i) for i in range(3, 6)])
+    assert external_row[1] in read_events_csv(csv_path)["MessageId"].tolist()
+
+    anyio.run(t.reload_dfs)
+    assert external_row[1] in t.df["MessageId"].tolist()
+
+    # This flush passes COMPACT_APPENDED_ROWS, so the whole file is rewritten.
+    flush_rows(t, [make_row(i) for i in range(6, 9)])
+    on_disk = read_events_csv(csv_path)
+    assert external_row[1] in on_disk["MessageId"].tolist()
+    assert len(on_disk) == 10
+    assert on_disk.index.is_monotonic_increasing
+
+
+def test_compaction_keeps_rows_missing_from_df(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Compaction merges with the file instead of overwriting it with df."""
+    monkeypatch.setattr(tui, "COMPACT_APPENDED_ROWS", 2)
+    t = make_tui(tmp_path)
+    csv_path = t.settings.paths.csv_path
+    flush_rows(t, [make_row(i) for i in range(2)])
+    external_row = add_external_row(csv_path, -1)
+
+    flush_rows(t, [make_row(2), make_row(1)])
+    on_disk = read_events_csv(csv_path)
+    assert external_row[1] in on_disk["MessageId"].tolist()
+    assert on_disk["MessageId"].is_unique
+    assert len(on_disk) == 4
+    assert on_disk.index.is_monotonic_increasing
+
+
+def test_tui_task_writes_pending_events_on_shutdown(tmp_path: Path) -> None:
+    """Cancelling tui_task flushes live history and stops the writer thread."""
+    t = make_tui(tmp_path)
+    t.settings.tui.flush_seconds = 3600
+    events = [
+        ProblemEvent(
+            Src="beta.scada",
+            ProblemType=Problems.warning,
+            Summary=f"summary {i}",
+            TimeCreatedMs=1_700_000_000_000 + i,
+        )
+        for i in [2, 0, 1]
+    ]
+    for event in events:
+        t.queue.put_nowait(Message(Src="beta.scada", Payload=event))
+
+    async def run_then_cancel() -> None:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(t.tui_task)
+            await anyio.sleep(0.2)
+            tg.cancel_scope.cancel()
+
+    anyio.run(run_then_cancel)
+    assert not t._io_thread.is_alive()
+    on_disk = read_events_csv(t.settings.paths.csv_path)
+    assert set(on_disk["MessageId"]) == {event.MessageId for event in events}
+    assert on_disk.index.is_monotonic_increasing
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        ProblemEvent(
+            Src="beta.scada",
+            ProblemType=Problems.error,
+            Summary="first line\nsecond line",
+            Details="details",
+        ),
+        ShutdownEvent(Src="beta.scada", Reason="stopping:\ntraceback"),
+        ShutdownEvent(Src="beta.scada", Reason="stopping"),
+        StartupEvent(Src="beta.scada"),
+        MQTTFullySubscribedEvent(Src="beta.scada", PeerName="gridworks_mqtt"),
+    ],
+)
+def test_event_to_row_matches_as_pandas_record(event: EventBase) -> None:
+    """_event_to_row gives the same values as AnyEvent.as_pandas_record."""
+    record = AnyEvent(**event.model_dump()).as_pandas_record(interpolate_summary=True)
+    assert tui.TUI._event_to_row(event) == (
+        record[tui.EVENT_INDEX],
+        *(record[column] for column in tui.EVENT_COLUMNS),
+    )
+
+
+def write_snapshot(settings: EventsSettings, alias: str) -> None:
+    snap = SnapshotSpaceheat(
+        FromGNodeAlias=alias,
+        FromGNodeInstanceId=str(uuid.uuid4()),
+        SnapshotTimeUnixMs=1_700_000_000_000,
+        LatestReadingList=[
+            SingleReading(
+                ChannelName="temp", Value=1, ScadaReadTimeUnixMs=1_700_000_000_000
+            )
+        ],
+        LatestStateList=[],
+    )
+    tui.TUI.write_snapshot(
+        settings.paths.snap_path(alias), snap.model_dump_json(indent=2)
+    )
+
+
+@pytest.mark.parametrize(
+    "aliases,requested,expected",
+    [
+        # Requested order, not snapshot file order; each scada selected once.
+        (
+            ["beech.scada", "oak.scada", "pine.scada"],
+            ["oak", "beech", "scada"],
+            ["oak.scada", "beech.scada", "pine.scada"],
+        ),
+        (["beech.scada", "oak.scada"], ["oak"], ["oak.scada", "beech.scada"]),
+        (["oak.scada"], ["elm"], ["oak.scada", ""]),
+        ([], ["oak"], ["", ""]),
+    ],
+)
+def test_select_scadas_for_snaps(
+    tmp_path: Path, aliases: list[str], requested: list[str], expected: list[str]
+) -> None:
+    """Requested scadas come first in --snap order, padded to two slots."""
+    settings = make_settings(tmp_path)
+    settings.snaps = requested
+    for alias in aliases:
+        write_snapshot(settings, alias)
+    t = tui.TUI(settings, read_only=True)
+    assert t.scadas_to_snap == expected
@@ -0,0 +1,22 @@
+"""Test cases for the gwdcli.utils.settings module."""
+
+import pytest
+from pydantic import ValidationError
+
+from gwdcli.utils.settings import S3Settings
+
+
+@pytest.mark.parametrize("prefix", ["eventstore", "eventstore/", "eventstore//"])
+def test_s3_settings_keys_strip_trailing_slash(prefix: str) -> None:
+    """subprefix and synced_key are the same with or without a trailing '/'."""
+    s3 = S3Settings(bucket="gwbucket", prefix=prefix)
+    assert s3.subprefix("beta.scada") == "eventstore/beta.scada"
+    assert s3.synced_key("beta.scada") == "gwbucket/eventstore/beta.scada"
+
+
+def test_s3_settings_is_frozen() -> None:
+    """Fields cannot be assigned, so the cached prefixes stay current."""
+    s3 = S3Settings(bucket="gwbucket", prefix="eventstore")
+    with pytest.raises(ValidationError):
+        s3.prefix = "other"
+    assert s3.subprefix("beta.scada") == "eventstore/beta.scada"